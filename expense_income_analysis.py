@@ -1,156 +1,288 @@
+import atexit
+import functools
+import re
 import pandas as pd
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import matplotlib.pyplot as plt
 import seaborn as sns
-import emoji
 
 # Database path
 DB_PATH = r"./money_manager.db"
 
-def execute_query(sql_script: str) -> pd.DataFrame:
+# Opt-in: also store an expression index on the month key in the database file.
+# It becomes part of the app's schema, and SQLite older than 3.20 (e.g. on older
+# Android versions) treats date functions as non-deterministic and rejects such a schema.
+CREATE_MONTH_INDEX = False
+
+# One connection per thread, opened lazily on first query and reused afterwards
+_LOCAL = threading.local()
+_CONNS = []
+_CONNS_LOCK = threading.Lock()
+
+# Indexes the analysis queries rely on; ZMONEY is included so the SUMs are covered by the index
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_inoutcome_type_date ON INOUTCOME(DO_TYPE, WDATE, ctgUid, assetUid, ZMONEY)",
+    "CREATE INDEX IF NOT EXISTS idx_zcategory_puid ON ZCATEGORY(pUid)",
+)
+
+# Expression index: only used when a query spells the month key exactly as strftime('%Y-%m', WDATE)
+_MONTH_INDEX = "CREATE INDEX IF NOT EXISTS idx_inoutcome_ym ON INOUTCOME(strftime('%Y-%m', WDATE), DO_TYPE, ZMONEY)"
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Returns the calling thread's SQLite connection, opening it on first use.
     """
-    Executes a SQL query and returns the result as a pandas DataFrame.
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None:
+        # check_same_thread=False only so that _close_conns can close it from the main thread
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        with _CONNS_LOCK:
+            # The first connection creates the indexes; others wait here until it is done
+            if not _CONNS:
+                try:
+                    with conn:
+                        for statement in _INDEXES + ((_MONTH_INDEX,) if CREATE_MONTH_INDEX else ()):
+                            conn.execute(statement)
+                except sqlite3.OperationalError:
+                    # Read-only database: queries still work, just without the extra indexes
+                    pass
+            _CONNS.append(conn)
+        _LOCAL.conn = conn
+    return conn
+
+@atexit.register
+def _close_conns():
+    with _CONNS_LOCK:
+        for conn in _CONNS:
+            conn.close()
+        _CONNS.clear()
+
+# Known result columns; SQLite returns integer sums when all amounts happen to be whole numbers
+_DTYPES = {
+    "Month": "string",
+    "YearMonth": "string",
+    "Category": "string",
+    "MainCategory": "string",
+    "PaymentMethod": "string",
+    "TotalIncome": "float64",
+    "TotalExpenses": "float64",
+    "TotalSpent": "float64",
+    "TotalReceived": "float64",
+    "AvgMonthlyExpense": "float64",
+    "Total": "float64",
+    "TotalIncomeCents": "int64",
+    "TotalExpensesCents": "int64",
+    "IncomeRows": "int64",
+    "ExpenseRows": "int64",
+}
+
+@functools.lru_cache(maxsize=64)
+def _cached_sql(sql_script: str, params: tuple) -> pd.DataFrame:
+    df = pd.read_sql_query(sql_script, _get_conn(), params=params)
+    return df.astype({k: v for k, v in _DTYPES.items() if k in df.columns}, copy=False)
+
+def execute_query(sql_script: str, params: tuple = ()) -> pd.DataFrame:
     """
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql_query(sql_script, conn)
+    Executes a SQL query, with optional bound parameters, and returns the result as a pandas DataFrame.
+    Results are cached per SQL text and parameters; callers get a shallow copy so that
+    assigning columns does not alter the cached frame.
+    """
+    return _cached_sql(sql_script, tuple(params)).copy(deep=False)
+
+# Code points removed by clean_emoji: the emoji blocks plus the joiners and
+# modifiers used to build multi-codepoint emojis (ZWJ, keycap, variation selectors, tags)
+_EMOJI_RANGES = (
+    (0x1F000, 0x1FFFF),  # Mahjong/cards, pictographs, emoticons, transport, flags, skin tones
+    (0x2600, 0x27BF),    # Miscellaneous Symbols, Dingbats
+    (0x2B00, 0x2BFF),    # Miscellaneous Symbols and Arrows (stars, circles)
+    (0x231A, 0x231B),    # Watch, hourglass
+    (0x23E9, 0x23FA),    # Media control symbols, alarm clock
+    (0x200D, 0x200D),    # Zero width joiner
+    (0x20E3, 0x20E3),    # Combining enclosing keycap
+    (0xFE00, 0xFE0F),    # Variation selectors
+    (0xE0020, 0xE007F),  # Tag characters (subdivision flags)
+    # Single emoji code points outside the blocks above
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE),  # Copyright, registered
+    (0x203C, 0x203C), (0x2049, 0x2049),  # Double exclamation, exclamation question
+    (0x2122, 0x2122), (0x2139, 0x2139),  # Trade mark, information
+    (0x2194, 0x2199), (0x21A9, 0x21AA),  # Arrows
+    (0x2328, 0x2328), (0x23CF, 0x23CF),  # Keyboard, eject
+    (0x24C2, 0x24C2),                    # Circled M
+    (0x25AA, 0x25AB), (0x25B6, 0x25B6), (0x25C0, 0x25C0), (0x25FB, 0x25FE),  # Squares, play/reverse
+    (0x2934, 0x2935),                    # Curved arrows
+    (0x3030, 0x3030), (0x303D, 0x303D),  # Wavy dash, part alternation mark
+    (0x3297, 0x3297), (0x3299, 0x3299),  # Circled ideographs
+)
+_EMOJI_TRANS = dict.fromkeys(
+    cp for start, end in _EMOJI_RANGES for cp in range(start, end + 1)
+)
+# Keycaps ("1️⃣", "#️⃣") start with an ordinary character, so they are removed as whole sequences first
+_KEYCAP_RE = re.compile("[0-9#*]\ufe0f?\u20e3")
 
 def clean_emoji(df: pd.DataFrame, column_name: str) -> pd.DataFrame:
     """
-    Removes emojis from a specified column in a DataFrame.
+    Returns a copy of the DataFrame with emojis removed from the specified column.
+    Each distinct name is cleaned only once and the column stays a plain string column.
+    """
+    mapping = {
+        name: _KEYCAP_RE.sub("", name).translate(_EMOJI_TRANS)
+        for name in df[column_name].unique()
+        if not pd.isna(name)
+    }
+    return df.assign(**{column_name: df[column_name].map(mapping).astype("string")})
+
+def _to_euros(cents: pd.Series) -> pd.Series:
+    """Converts integer cent amounts to euros for display."""
+    return cents / 100
+
+def get_monthly_core() -> pd.DataFrame:
+    """
+    Fetches total income and expenses per month, in integer cents, in a single pass over INOUTCOME.
+    The other monthly helpers derive their figures from this result and convert to euros last;
+    execute_query caches it, so only the first call reads the table.
     """
-    df[column_name] = df[column_name].apply(lambda x: emoji.replace_emoji(x, replace=""))
-    return df
-
-def get_monthly_summary() -> pd.DataFrame:
-    """Fetches the total income and expenses for each month."""
     return execute_query('''
         SELECT 
             strftime('%Y-%m', WDATE) AS Month,
-            SUM(CASE WHEN DO_TYPE = 1 THEN ZMONEY ELSE 0 END) AS TotalExpenses,
-            SUM(CASE WHEN DO_TYPE = 0 THEN ZMONEY ELSE 0 END) AS TotalIncome
+            SUM(CASE WHEN DO_TYPE = 0 THEN CAST(ROUND(ZMONEY * 100) AS INTEGER) ELSE 0 END) AS TotalIncomeCents,
+            SUM(CASE WHEN DO_TYPE = 1 THEN CAST(ROUND(ZMONEY * 100) AS INTEGER) ELSE 0 END) AS TotalExpensesCents,
+            COUNT(CASE WHEN DO_TYPE = 0 THEN 1 END) AS IncomeRows,
+            COUNT(CASE WHEN DO_TYPE = 1 THEN 1 END) AS ExpenseRows
         FROM INOUTCOME
         GROUP BY Month
         ORDER BY Month;
     ''')
 
+def get_monthly_summary() -> pd.DataFrame:
+    """Fetches the total income and expenses for each month."""
+    df = get_monthly_core()
+    return df[["Month"]].assign(
+        TotalExpenses=_to_euros(df["TotalExpensesCents"]),
+        TotalIncome=_to_euros(df["TotalIncomeCents"]),
+    )
+
 def get_monthly_net_revenue() -> pd.DataFrame:
     """Calculates the net revenue for each month."""
-    return execute_query('''
-        SELECT 
-            strftime('%Y-%m', WDATE) AS Month,
-            SUM(CASE WHEN DO_TYPE = 0 THEN ZMONEY ELSE 0 END) -
-            SUM(CASE WHEN DO_TYPE = 1 THEN ZMONEY ELSE 0 END) AS NetRevenue
-        FROM INOUTCOME
-        GROUP BY Month
-        ORDER BY Month;
-    ''')
+    df = get_monthly_core()
+    return df[["Month"]].assign(NetRevenue=_to_euros(df["TotalIncomeCents"] - df["TotalExpensesCents"]))
 
 def get_revenue_analysis_data() -> pd.DataFrame:
     """Gathers data for monthly revenue analysis, including income, expenses, and net revenue."""
-    return execute_query('''
-        SELECT 
-            strftime('%m-%Y', WDATE) AS Month_Year, 
-            SUM(CASE WHEN DO_TYPE = 0 THEN ZMONEY ELSE 0 END) AS TotalIncome,
-            SUM(CASE WHEN DO_TYPE = 1 THEN ZMONEY ELSE 0 END) AS TotalExpenses,
-            SUM(CASE WHEN DO_TYPE = 0 THEN ZMONEY ELSE 0 END) - SUM(CASE WHEN DO_TYPE = 1 THEN ZMONEY ELSE 0 END) AS Revenue
-        FROM INOUTCOME
-        GROUP BY Month_Year
-        ORDER BY strftime('%Y', WDATE), strftime('%m', WDATE);
-    ''')
+    df = get_monthly_core()
+    # Month is 'YYYY-MM'; the revenue plot labels months as 'MM-YYYY'
+    month_year = df["Month"].str[5:7] + "-" + df["Month"].str[:4]
+    return pd.DataFrame({
+        "Month_Year": month_year,
+        "TotalIncome": _to_euros(df["TotalIncomeCents"]),
+        "TotalExpenses": _to_euros(df["TotalExpensesCents"]),
+        "Revenue": _to_euros(df["TotalIncomeCents"] - df["TotalExpensesCents"]),
+    })
 
 def get_average_monthly_figure(transaction_type: int) -> pd.DataFrame:
     """
     Calculates the average monthly income or expense.
     """
     entity = "Spending" if transaction_type == 1 else "Income"
-    return execute_query(f'''
-        SELECT ROUND(AVG(monthly_total), 2) AS AverageMonthly{entity}
-        FROM (
-            SELECT strftime('%Y-%m', WDATE) AS Month, SUM(ZMONEY) AS monthly_total
-            FROM INOUTCOME
-            WHERE DO_TYPE = {transaction_type}
-            GROUP BY Month
-        );
-    ''')
+    column = "TotalExpensesCents" if transaction_type == 1 else "TotalIncomeCents"
+    rows = "ExpenseRows" if transaction_type == 1 else "IncomeRows"
+    df = get_monthly_core()
+    # Only average over months that actually had transactions of this type
+    monthly_totals = df.loc[df[rows] > 0, column]
+    return pd.DataFrame({f"AverageMonthly{entity}": [round(monthly_totals.mean() / 100, 2)]})
+
+# Category summary queries keyed by `by_main_category`; DO_TYPE is bound at execution time
+_SUMMARY_SQL = {
+    False: '''
+        SELECT 
+            c.NAME AS Category,
+            SUM(i.ZMONEY) AS Total
+        FROM INOUTCOME i
+        JOIN ZCATEGORY c ON i.ctgUid = c.uid
+        WHERE i.DO_TYPE = ?
+        GROUP BY c.NAME
+        ORDER BY Total DESC;
+    ''',
+    True: '''
+        SELECT 
+            COALESCE(mc.NAME, c.NAME) AS Category,
+            SUM(i.ZMONEY) AS Total
+        FROM INOUTCOME i
+        JOIN ZCATEGORY c ON i.ctgUid = c.uid
+        LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid
+        WHERE i.DO_TYPE = ?
+        GROUP BY COALESCE(mc.NAME, c.NAME)
+        ORDER BY Total DESC;
+    ''',
+}
 
 def get_summary_by_category(transaction_type: int, by_main_category: bool = False) -> pd.DataFrame:
     """
     Summarizes financial data by category or main category.
     """
-    category_col = "COALESCE(mc.NAME, c.NAME) AS Category" if by_main_category else "c.NAME AS Category"
     entity = "TotalSpent" if transaction_type == 1 else "TotalIncome"
-    join_clause = "LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid" if by_main_category else ""
-    group_by_col = "COALESCE(mc.NAME, c.NAME)" if by_main_category else "c.NAME"
-
-    query = f'''
+    df = execute_query(_SUMMARY_SQL[by_main_category], (transaction_type,))
+    return clean_emoji(df.rename(columns={"Total": entity}), "Category")
+    
+# Monthly category totals keyed by `by_main_category`; DO_TYPE is bound at execution time
+_MONTHLY_SUMMARY_SQL = {
+    False: '''
         SELECT 
-            {category_col},
-            SUM(i.ZMONEY) AS {entity}
+            strftime('%Y-%m', i.WDATE) AS Month,
+            c.NAME AS Category,
+            ROUND(SUM(i.ZMONEY), 2) AS Total
         FROM INOUTCOME i
         JOIN ZCATEGORY c ON i.ctgUid = c.uid
-        {join_clause}
-        WHERE i.DO_TYPE = {transaction_type}
-        GROUP BY {group_by_col}
-        ORDER BY {entity} DESC;
-    '''
-    df = execute_query(query)
-    # The `Category` column in get_summary_by_category will be either 'Category' or 'MainCategory' depending on `by_main_category`
-    # We should ensure we clean the correct column name.
-    if by_main_category:
-        return clean_emoji(df, "Category") # The alias is always 'Category' in this function's result.
-    else:
-        return clean_emoji(df, "Category")
-    
-def get_monthly_summary_by_category(transaction_type: int, by_main_category: bool = False) -> pd.DataFrame:
-    """
-    Creates a pivot table of monthly financial data by category.
-    """
-    category_col_alias = "MainCategory" if by_main_category else "Category"
-    category_col = f"COALESCE(mc.NAME, c.NAME) AS {category_col_alias}" if by_main_category else f"c.NAME AS {category_col_alias}"
-    entity = "TotalExpense" if transaction_type == 1 else "TotalIncome"
-    join_clause = "LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid" if by_main_category else ""
-
-    query = f'''
+        WHERE i.DO_TYPE = ?
+        GROUP BY Month, Category
+        ORDER BY Month, Total DESC;
+    ''',
+    True: '''
         SELECT 
             strftime('%Y-%m', i.WDATE) AS Month,
-            {category_col},
-            ROUND(SUM(i.ZMONEY), 2) AS {entity}
+            COALESCE(mc.NAME, c.NAME) AS MainCategory,
+            ROUND(SUM(i.ZMONEY), 2) AS Total
         FROM INOUTCOME i
         JOIN ZCATEGORY c ON i.ctgUid = c.uid
-        {join_clause}
-        WHERE i.DO_TYPE = {transaction_type}
-        GROUP BY Month, {category_col_alias}
-        ORDER BY Month, {entity} DESC;
-    '''
-    
-    monthly_data = execute_query(query)
-    clean_emoji(monthly_data, category_col_alias)
+        LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid
+        WHERE i.DO_TYPE = ?
+        GROUP BY Month, MainCategory
+        ORDER BY Month, Total DESC;
+    ''',
+}
 
-    return monthly_data.pivot_table(
-        index='Month',
-        columns=category_col_alias,
-        values=entity,
-        fill_value=0
-    ).round(2)
+def get_monthly_summary_by_category(transaction_type: int, by_main_category: bool = False) -> pd.DataFrame:
+    """
+    Creates a pivot table of monthly financial data by category.
+    """
+    category_col_alias = "MainCategory" if by_main_category else "Category"
+    monthly_data = execute_query(_MONTHLY_SUMMARY_SQL[by_main_category], (transaction_type,))
+    monthly_data = clean_emoji(monthly_data, category_col_alias)
+
+    # Names that differ only by emoji collapse once cleaned, so pairs must be summed again before reshaping
+    return (
+        monthly_data.groupby(['Month', category_col_alias], observed=True)['Total']
+        .sum()
+        .unstack(fill_value=0)
+    )
 
 
 def get_average_expense_by_main_category() -> pd.DataFrame:
     """Calculates the average monthly expense for each main category."""
+    # Sum over all months divided by the number of months with spending equals
+    # the average of the monthly sums, without materializing the per-month rows
     query = '''
         SELECT 
-            MainCategory,
-            ROUND(AVG(MonthlyTotal), 2) AS AvgMonthlyExpense
-        FROM (
-            SELECT 
-                COALESCE(mc.NAME, c.NAME) AS MainCategory,
-                strftime('%Y-%m', i.WDATE) AS YearMonth,
-                SUM(i.ZMONEY) AS MonthlyTotal
-            FROM INOUTCOME i
-            JOIN ZCATEGORY c ON i.ctgUid = c.uid
-            LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid
-            WHERE i.DO_TYPE = 1
-            GROUP BY MainCategory, YearMonth
-        ) AS MonthlySums
+            COALESCE(mc.NAME, c.NAME) AS MainCategory,
+            ROUND(SUM(i.ZMONEY) * 1.0 / COUNT(DISTINCT strftime('%Y-%m', i.WDATE)), 2) AS AvgMonthlyExpense
+        FROM INOUTCOME i
+        JOIN ZCATEGORY c ON i.ctgUid = c.uid
+        LEFT JOIN ZCATEGORY mc ON c.pUid = mc.uid
+        WHERE i.DO_TYPE = 1
         GROUP BY MainCategory
         ORDER BY AvgMonthlyExpense DESC;
     '''
@@ -158,33 +290,35 @@ def get_average_expense_by_main_category() -> pd.DataFrame:
     return clean_emoji(df, "MainCategory")
 
 
+_PAYMENT_METHOD_SQL = '''
+    SELECT 
+        a.NIC_NAME AS PaymentMethod,
+        SUM(i.ZMONEY) AS Total
+    FROM INOUTCOME i
+    JOIN ASSETS a ON i.assetUid = a.uid
+    WHERE i.DO_TYPE = ?
+    GROUP BY a.NIC_NAME
+    ORDER BY Total DESC;
+'''
+
 def get_summary_by_payment_method(transaction_type: int) -> pd.DataFrame:
     """
     Summarizes transactions by payment method.
     """
     entity = "TotalSpent" if transaction_type == 1 else "TotalReceived"
-    return execute_query(f'''
-        SELECT 
-            a.NIC_NAME AS PaymentMethod,
-            SUM(i.ZMONEY) AS {entity}
-        FROM INOUTCOME i
-        JOIN ASSETS a ON i.assetUid = a.uid
-        WHERE i.DO_TYPE = {transaction_type}
-        GROUP BY a.NIC_NAME
-        ORDER BY {entity} DESC;
-    ''')
+    df = execute_query(_PAYMENT_METHOD_SQL, (transaction_type,))
+    return df.rename(columns={"Total": entity})
 
 
 def get_month_with_highest_expense() -> pd.DataFrame:
     """Identifies the month with the highest total expenses."""
-    return execute_query('''
-        SELECT strftime('%Y-%m', WDATE) AS Month, SUM(ZMONEY) AS Total
-        FROM INOUTCOME
-        WHERE DO_TYPE = 1
-        GROUP BY Month
-        ORDER BY Total DESC
-        LIMIT 1;
-    ''')
+    df = get_monthly_core()
+    df = df[df["ExpenseRows"] > 0]
+    # No expenses at all: return an empty frame with the usual columns
+    if df.empty:
+        return pd.DataFrame({"Month": pd.Series(dtype="string"), "Total": pd.Series(dtype="float64")})
+    highest = df.loc[[df["TotalExpensesCents"].idxmax()]].reset_index(drop=True)
+    return highest[["Month"]].assign(Total=_to_euros(highest["TotalExpensesCents"]))
 
 
 
@@ -202,94 +336,110 @@ def get_monthly_expense_distribution() -> pd.DataFrame:
         ORDER BY YearMonth, TotalSpent DESC;
     '''
     df = execute_query(query)
-    df = clean_emoji(df, "Category") 
-    
-    return df
+    return clean_emoji(df, "Category")
 
 # --- Plotting Functions ---
 
-def plot_revenue_analysis(df: pd.DataFrame):
-    """Plots monthly income, expenses, and revenue."""
-    plt.figure(figsize=(12, 6))
-    plt.plot(df["Month_Year"], df["TotalIncome"], label="Income", marker="o", color="green")
-    plt.plot(df["Month_Year"], df["TotalExpenses"], label="Expenses", marker="o", color="red")
-    plt.plot(df["Month_Year"], df["Revenue"], label="Revenue", marker="o", color="blue")
-    plt.xlabel("Month-Year")
-    plt.ylabel("Amount (€)")
-    plt.title("Monthly Revenue Analysis")
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
-
-
-def plot_expenses_by_main_category(df: pd.DataFrame):
-    """Plots a bar chart of total expenses by main category."""
+def plot_revenue_analysis(df: pd.DataFrame, ax: Optional[plt.Axes] = None):
+    """
+    Plots monthly income, expenses, and revenue.
+    Draws on `ax` if given, otherwise on a new figure that is shown immediately.
+    """
+    show = ax is None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(12, 6), layout='constrained')
+    ax.plot(df["Month_Year"], df["TotalIncome"], label="Income", marker="o", color="green")
+    ax.plot(df["Month_Year"], df["TotalExpenses"], label="Expenses", marker="o", color="red")
+    ax.plot(df["Month_Year"], df["Revenue"], label="Revenue", marker="o", color="blue")
+    ax.set_xlabel("Month-Year")
+    ax.set_ylabel("Amount (€)")
+    ax.set_title("Monthly Revenue Analysis")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend()
+    ax.grid(True)
+    if show:
+        plt.show()
+
+
+def plot_expenses_by_main_category(df: pd.DataFrame, ax: Optional[plt.Axes] = None):
+    """
+    Plots a bar chart of total expenses by main category.
+    Draws on `ax` if given, otherwise on a new figure that is shown immediately.
+    """
+    show = ax is None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
     df.plot(
         kind='bar',
         x='Category',
         y='TotalSpent',
-        figsize=(10, 6),
+        ax=ax,
         legend=False,
         color='slateblue'
     )
-    plt.title("Total Expenses by Main Category")
-    plt.ylabel("Total Expenses (€)")
-    plt.xlabel("Main Category")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.show()
+    ax.set_title("Total Expenses by Main Category")
+    ax.set_ylabel("Total Expenses (€)")
+    ax.set_xlabel("Main Category")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    if show:
+        plt.show()
 
 
-def plot_monthly_trends_by_category(df_pivot: pd.DataFrame, title: str):
+def plot_monthly_trends_by_category(df_pivot: pd.DataFrame, title: str, ax: Optional[plt.Axes] = None):
     """
     Plots monthly trends for different categories from a pivot table.
+    Draws on `ax` if given, otherwise on a new figure that is shown immediately.
     """
-    plt.figure(figsize=(14, 7))
-    for category in df_pivot.columns:
-        plt.plot(df_pivot.index, df_pivot[category], marker='o', label=category)
-    plt.title(title)
-    plt.xlabel("Month")
-    plt.ylabel("Amount (€)")
-    plt.xticks(rotation=45)
-    plt.grid(True)
-    plt.legend(loc='center left', bbox_to_anchor=(1, 0.5))
-    plt.tight_layout()
-    plt.show()
+    show = ax is None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(14, 7), layout='constrained')
+    # One call draws a line per column of the 2D array
+    lines = ax.plot(df_pivot.index, df_pivot.to_numpy(), marker='o')
+    ax.set_title(title)
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Amount (€)")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.grid(True)
+    ax.legend(lines, df_pivot.columns, loc='center left', bbox_to_anchor=(1, 0.5))
+    if show:
+        plt.show()
 
 
 def plot_monthly_expense_distribution_pie(df: pd.DataFrame):
     """
     Generates a pie chart for expense distribution for each month.
     """
-    for month in df["YearMonth"].unique():
-        data = df[df["YearMonth"] == month].copy() 
-        
-        # Filter out negative expenses as pie charts cannot represent them
-        data = data[data["TotalSpent"] >= 0] 
+    # Negative expenses cannot be drawn on a pie chart, so they get no share;
+    # months whose remaining total is zero end up with no shares at all
+    spent = df["TotalSpent"].where(df["TotalSpent"] >= 0)
+    share = spent / spent.groupby(df["YearMonth"]).transform("sum")
+
+    for month, data in df.assign(Share=share).groupby("YearMonth", sort=False):
+        data = data.dropna(subset=["Share"])
         
         # Skip plotting if there's no positive data for the month
-        if data.empty or data["TotalSpent"].sum() == 0:
+        if data.empty:
             print(f"No positive expenses to plot for {month}. Skipping pie chart.")
             continue
 
-        plt.figure(figsize=(8, 8))
-        plt.pie(data["TotalSpent"], labels=data["Category"], autopct='%1.1f%%', startangle=140)
-        plt.title(f"Expense Distribution by Category for {month}")
-        plt.tight_layout()
+        fig, ax = plt.subplots(figsize=(8, 8), layout='constrained')
+        ax.pie(data["Share"].to_numpy(), labels=data["Category"].to_numpy(), autopct='%1.1f%%', startangle=140)
+        ax.set_title(f"Expense Distribution by Category for {month}")
         plt.show()
 
-def plot_average_monthly_expense_pie(df: pd.DataFrame):
+def plot_average_monthly_expense_pie(df: pd.DataFrame, ax: Optional[plt.Axes] = None):
     """
     Generates a pie chart for the average monthly expense by main category.
+    Draws on `ax` if given, otherwise on a new figure that is shown immediately.
     """
     labels = df["MainCategory"]
     sizes = df["AvgMonthlyExpense"]
     
     colors = plt.cm.viridis_r([i/float(len(labels)) for i in range(len(labels))])
 
-    fig, ax = plt.subplots(figsize=(12, 8))
+    show = ax is None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(12, 8), layout='constrained')
     wedges, texts, autotexts = ax.pie(
         sizes,
         autopct='%1.1f%%',
@@ -302,11 +452,31 @@ def plot_average_monthly_expense_pie(df: pd.DataFrame):
     ax.legend(wedges, labels, title="Main Categories", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
     plt.setp(autotexts, size=8, weight="bold")
     ax.set_title("Average Monthly Expense by Main Category")
-    plt.show()
+    if show:
+        plt.show()
 
 
 if __name__ == "__main__":
-    # --- Data Retrieval and Display ---
+    # --- Data Retrieval ---
+    # The queries are independent, so run them concurrently; each worker thread uses its own connection
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            "monthly_core": executor.submit(get_monthly_core),
+            "expense_by_category": executor.submit(get_summary_by_category, transaction_type=1),
+            "expense_by_main_category": executor.submit(get_summary_by_category, transaction_type=1, by_main_category=True),
+            "income_by_category": executor.submit(get_summary_by_category, transaction_type=0, by_main_category=True),
+            "monthly_expense_pivot": executor.submit(get_monthly_summary_by_category, transaction_type=1),
+            "monthly_main_expense_pivot": executor.submit(get_monthly_summary_by_category, transaction_type=1, by_main_category=True),
+            "monthly_main_income_pivot": executor.submit(get_monthly_summary_by_category, transaction_type=0, by_main_category=True),
+            "avg_expense_main_category": executor.submit(get_average_expense_by_main_category),
+            "expenses_by_payment_method": executor.submit(get_summary_by_payment_method, transaction_type=1),
+            "income_by_payment_method": executor.submit(get_summary_by_payment_method, transaction_type=0),
+            "monthly_expense_dist": executor.submit(get_monthly_expense_distribution),
+        }
+    results = {name: future.result() for name, future in futures.items()}
+
+    # --- Display ---
+    # The monthly figures below are derived from the get_monthly_core() result cached above
     monthly_summary = get_monthly_summary()
     print("--- Monthly Income and Expenses ---\n", monthly_summary, "\n")
     
@@ -319,37 +489,38 @@ if __name__ == "__main__":
     avg_monthly_income = get_average_monthly_figure(transaction_type=0)
     print("--- Average Monthly Income ---\n", avg_monthly_income, "\n")
 
-    expense_by_category = get_summary_by_category(transaction_type=1)
+    expense_by_category = results["expense_by_category"]
     print("--- Expenses by Sub-Category ---\n", expense_by_category, "\n")
     
-    expense_by_main_category = get_summary_by_category(transaction_type=1, by_main_category=True)
+    expense_by_main_category = results["expense_by_main_category"]
     print("--- Expenses by Main Category ---\n", expense_by_main_category, "\n")
 
-    income_by_category = get_summary_by_category(transaction_type=0, by_main_category=True)
+    income_by_category = results["income_by_category"]
     print("--- Income by Main Category ---\n", income_by_category, "\n")
 
-    monthly_expense_pivot = get_monthly_summary_by_category(transaction_type=1)
+    monthly_expense_pivot = results["monthly_expense_pivot"]
     print("--- Monthly Expenses by Sub-Category (Pivot) ---\n", monthly_expense_pivot, "\n")
     
-    monthly_main_expense_pivot = get_monthly_summary_by_category(transaction_type=1, by_main_category=True)
+    monthly_main_expense_pivot = results["monthly_main_expense_pivot"]
     print("--- Monthly Expenses by Main Category (Pivot) ---\n", monthly_main_expense_pivot, "\n")
 
-    monthly_main_income_pivot = get_monthly_summary_by_category(transaction_type=0, by_main_category=True)
+    monthly_main_income_pivot = results["monthly_main_income_pivot"]
     print("--- Monthly Income by Main Category (Pivot) ---\n", monthly_main_income_pivot, "\n")
     
-    avg_expense_main_category = get_average_expense_by_main_category()
+    avg_expense_main_category = results["avg_expense_main_category"]
     print("--- Average Monthly Expense by Main Category ---\n", avg_expense_main_category, "\n")
 
-    expenses_by_payment_method = get_summary_by_payment_method(transaction_type=1)
+    expenses_by_payment_method = results["expenses_by_payment_method"]
     print("--- Expenses by Payment Method ---\n", expenses_by_payment_method, "\n")
 
-    income_by_payment_method = get_summary_by_payment_method(transaction_type=0)
+    income_by_payment_method = results["income_by_payment_method"]
     print("--- Income by Payment Method ---\n", income_by_payment_method, "\n")
 
     month_highest_expense = get_month_with_highest_expense()
     print("--- Month with Highest Expenses ---\n", month_highest_expense, "\n")
 
     # --- Visualizations ---
+    # Plotting stays on the main thread; matplotlib is not thread-safe
     revenue_data = get_revenue_analysis_data()
     plot_revenue_analysis(revenue_data)
 
@@ -359,7 +530,7 @@ if __name__ == "__main__":
     
     plot_monthly_trends_by_category(monthly_main_income_pivot, "Monthly Income Trends by Main Category")
     
-    monthly_expense_dist = get_monthly_expense_distribution()
+    monthly_expense_dist = results["monthly_expense_dist"]
     plot_monthly_expense_distribution_pie(monthly_expense_dist)
 
     plot_average_monthly_expense_pie(avg_expense_main_category)
\ No newline at end of file